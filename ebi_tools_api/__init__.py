@@ -1,15 +1,30 @@
-from typing import Literal, Union, Callable, Coroutine
-from dataclasses import dataclass
+from typing import Literal, Union, Callable, Coroutine, Optional
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor
 from functools import cached_property, partial
-from json import loads
+from collections import OrderedDict
+from json import dumps
 from pathlib import Path
+from uuid import uuid4
 import asyncio
-import pickle
+import random
+import os
+import threading
 import hashlib
+import sqlite3
 
-from pandas import DataFrame, isnull
+try:
+    # optional, much faster on large BLAST results
+    from orjson import loads
+except ImportError:
+    from json import loads
+
+from pandas import DataFrame, Series, CategoricalDtype, to_numeric
 from IPython.display import SVG, Image, display
 import requests
+from requests.adapters import HTTPAdapter
 
 
 def one(values, context):
@@ -32,61 +47,262 @@ protein_evidence_of_existence = {
     5: '5. Protein uncertain'
 }
 
+hit_databases = {
+    'SP': 'Swiss-Prot (Reviewed)',
+    'TR': 'TrEMBL (Unreviewed)'
+}
+
+# columns of BLAST hits which are not carried over to the simplified table
+dropped_hit_columns = {
+    'hit_def', 'hit_hsps', 'hit_desc',
+    'hit_xref_url', 'hit_url',
+    'hit_uni_ox', 'hit_db',
+    'hit_uni_pe'
+}
+
+# dropped columns which none of the simplified columns are derived from
+unused_hit_columns = dropped_hit_columns - {'hit_url', 'hit_db', 'hit_uni_pe'}
+
+# names in the simplified table; other columns only lose the `hit_` prefix
+simple_hit_columns = {
+    'hit_uni_de': 'description',
+    'hit_uni_os': 'species',
+    'hit_uni_gn': 'gene_name',
+    'hit_uni_sv': 'sequence_version',
+    'hit_len': 'length',
+    'hit_acc': 'accession',
+    'hit_id': 'identifier'
+}
+
 from contextlib import contextmanager
 
+CACHE_BUFFER_SIZE = 1 << 20
+MEMORY_CACHE_SIZE = 128
+# larger results get a file of their own rather than a row in the index
+INLINE_BODY_LIMIT = 64 << 10
+
+# serialised bodies of recently used results, by cache path; each caller parses its own copy
+_memory_cache: 'OrderedDict[Path, bytes]' = OrderedDict()
+_memory_cache_lock = threading.Lock()
+
+
+def _recall(cache_path: Path) -> Optional[bytes]:
+    with _memory_cache_lock:
+        body = _memory_cache.get(cache_path)
+        if body is not None:
+            _memory_cache.move_to_end(cache_path)
+        return body
+
+
+def _remember(cache_path: Path, body: bytes):
+    if not body:
+        return
+    with _memory_cache_lock:
+        _memory_cache[cache_path] = body
+        _memory_cache.move_to_end(cache_path)
+        if len(_memory_cache) > MEMORY_CACHE_SIZE:
+            _memory_cache.popitem(last=False)
+
+
+def _forget(cache_path: Path):
+    with _memory_cache_lock:
+        _memory_cache.pop(cache_path, None)
+
+
+def _forget_all(cache_dir: Path):
+    with _memory_cache_lock:
+        for cache_path in [path for path in _memory_cache if cache_dir in path.parents]:
+            del _memory_cache[cache_path]
+
+
+def _write_atomically(path: Path, write: Callable):
+    # written next to the target and moved into place, so that an interrupted write leaves no truncated file
+    tmp = path.with_name(f'{path.name}.{uuid4().hex}.tmp')
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0)
+    try:
+        fd = os.open(tmp, flags, 0o666)
+    except FileNotFoundError:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(tmp, flags, 0o666)
+    try:
+        with open(fd, 'wb', buffering=CACHE_BUFFER_SIZE) as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
 class CacheResource:
     def __init__(self):
        self.result = None
+       # serialised result, if the producer already has it
+       self.body = None
+       # stored in the `meta` column of the index (e.g. the ETag)
+       self.meta = {}
+       # the entry being replaced when resetting the cache
+       self.previous = None
+       self.previous_meta = {}
 
     def set_result(self, result):
        self.result = result
 
 
+# file suffix for each way of storing a result which is too large for the index
+CACHE_SUFFIXES = {
+    'json': '.json',
+    'bytes': '.bin',
+    'text': '.txt'
+}
+
+# cache_dir -> (connection to its cache.db, inode of the cache.db it was opened on)
+_indices: 'dict[Path, tuple]' = {}
+# connections are shared by the worker threads
+_index_lock = threading.Lock()
+
+
+def _connect_index(cache_dir: Path):
+    """Make sure that the index of `cache_dir` is connected, reconnecting if the cache was cleared."""
+    index_path = cache_dir / 'cache.db'
+    try:
+        inode = index_path.stat().st_ino
+    except FileNotFoundError:
+        inode = None
+    with _index_lock:
+        connection, connected_inode = _indices.get(cache_dir, (None, None))
+        # an open connection keeps reading a deleted database, hence the inode check
+        if connection is not None and inode is not None and inode == connected_inode:
+            return
+        if connection is not None:
+            connection.close()
+            # the cache was cleared
+            _forget_all(cache_dir)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(index_path, check_same_thread=False, isolation_level=None)
+        try:
+            journal_mode = connection.execute('PRAGMA journal_mode=WAL').fetchone()[0]
+        except sqlite3.OperationalError:
+            journal_mode = None
+        # without WAL (e.g. on network file systems) keep the default journal and full syncs
+        if journal_mode == 'wal':
+            connection.execute('PRAGMA synchronous=NORMAL')
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS cache('
+            'endpoint TEXT, hash TEXT, key TEXT, meta TEXT, body BLOB, PRIMARY KEY (endpoint, hash))'
+        )
+        _indices[cache_dir] = (connection, index_path.stat().st_ino)
+
+
+def _lookup(cache_dir: Path, endpoint: str, params_hash: str) -> Optional[tuple]:
+    with _index_lock:
+        connection, _ = _indices[cache_dir]
+        return connection.execute(
+            'SELECT key, meta, body FROM cache WHERE endpoint = ? AND hash = ?',
+            (endpoint, params_hash)
+        ).fetchone()
+
+
+def _store(cache_dir: Path, endpoint: str, params_hash: str, key: str, meta: str, body: Optional[bytes]):
+    with _index_lock:
+        connection, _ = _indices[cache_dir]
+        connection.execute(
+            'INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?)',
+            (endpoint, params_hash, key, meta, body)
+        )
+
+
+def _stored_body(entry: Optional[tuple], cache_path: Path) -> Optional[bytes]:
+    if entry is None:
+        return None
+    if entry[2] is not None:
+        return entry[2]
+    try:
+        return cache_path.read_bytes()
+    except OSError:
+        # missing or unreadable: fetch it again
+        return None
+
+
+def _serialize(data, serializer: str) -> bytes:
+    if serializer == 'json':
+        return dumps(data).encode()
+    if serializer == 'text':
+        return data.encode()
+    return data
+
+
+def _deserialize(body: bytes, serializer: str):
+    if serializer == 'json':
+        return loads(body)
+    if serializer == 'text':
+        return body.decode()
+    return body
+
+
 @contextmanager
-def disk_cache(self, endpoint: str, cached_only=False, **kwargs):
-    reset_cache = kwargs.pop('reset_cache', False)
-    verbose = kwargs.pop('verbose', False)
-    kwargs = {
-      k: kwargs[k]
-      for k in sorted(kwargs)
-    }
-    params_hash = hashlib.sha512(str(kwargs).encode()).hexdigest()
+def disk_cache(self, endpoint: str, cached_only=False, serializer: str = 'json', reset_cache=False, verbose=False, **kwargs):
+    # canonical JSON, also stored in the index to guard against collisions
+    key = dumps(kwargs, sort_keys=True, default=repr)
+    params_hash = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
     label = params_hash  # TODO: find a better way?
-    cache_path: Path = self.cache_dir / endpoint / str(params_hash)
+    cache_path: Path = (self.cache_dir / endpoint / str(params_hash)).with_suffix(CACHE_SUFFIXES[serializer])
+    _connect_index(self.cache_dir)
+    resource = CacheResource()
+    remembered = None
+    if reset_cache:
+        _forget(cache_path)
+    else:
+        remembered = _recall(cache_path)
+    entry = _lookup(self.cache_dir, endpoint, params_hash) if remembered is None else None
+    body = _stored_body(entry, cache_path)
     if verbose and reset_cache:
         print(
             f'Reseting cache for {label} as requested'
-            if cache_path.exists() else
+            if body is not None else
             f'Cache reset for {label} requested but there was no cache'
         )
-    resource = CacheResource()
-    if cache_path.exists() and not reset_cache:
+    if remembered is not None:
+        if verbose:
+            print(f'Cached result found for {label}, using copy from memory')
+        resource.set_result(_deserialize(remembered, serializer))
+        yield resource
+    elif body is not None and not reset_cache:
         if verbose:
             print(f'Cached result found for {label}, loading from disk')
-        with open(cache_path, 'rb') as f:
-            data = pickle.load(f)
         # guard against collisions
-        assert data['kwargs'] == kwargs
-        resource.set_result(data['result'])
+        assert entry[0] == key
+        resource.set_result(_deserialize(body, serializer))
+        _remember(cache_path, body)
         yield resource
     else:
         if cached_only:
             raise Exception(f'Cached copy not found in {cache_path}')
         if verbose:
             print(f'{cache_path} not found fetching...')
+        if body is not None:
+            resource.previous_meta = loads(entry[1])
+            resource.previous = _deserialize(body, serializer)
         yield resource
         data = resource.result
-        cache_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(cache_path, 'wb') as f:
-            pickle.dump({
-                'result': data,
-                'kwargs': kwargs
-            }, f)
-
-
-def disk_cached(func: Callable[..., Coroutine]):
-    async def wrapper(self, endpoint: str, cached_only=False, **kwargs):
-        with disk_cache(self, endpoint, cached_only, **kwargs) as cache_resource:
+        body = resource.body if resource.body is not None else _serialize(data, serializer)
+        if len(body) > INLINE_BODY_LIMIT:
+            # the file first, so that the index never refers to a missing one
+            _write_atomically(cache_path, lambda f: f.write(body))
+            _store(self.cache_dir, endpoint, params_hash, key, dumps(resource.meta), None)
+        else:
+            _store(self.cache_dir, endpoint, params_hash, key, dumps(resource.meta), body)
+            if entry is not None and entry[2] is None:
+                # superseded by the copy in the index
+                cache_path.unlink(missing_ok=True)
+        _remember(cache_path, body)
+
+
+def disk_cached(func: Callable[..., Coroutine] = None, serializer: str = 'json'):
+    if func is None:
+        return partial(disk_cached, serializer=serializer)
+
+    async def wrapper(self, endpoint: str, cached_only=False, reset_cache=False, verbose=False, **kwargs):
+        with disk_cache(self, endpoint, cached_only, serializer, reset_cache, verbose, **kwargs) as cache_resource:
             if cache_resource.result:
                 return cache_resource.result
             else:
@@ -96,16 +312,14 @@ def disk_cached(func: Callable[..., Coroutine]):
     return wrapper
 
 
-def disk_cached_sync(func: Callable):
-    def wrapper(self, endpoint: str, cached_only=False, **kwargs):
-        with disk_cache(self, endpoint, cached_only, **kwargs) as cache_resource:
-            if cache_resource.result:
-                return cache_resource.result
-            else:
-                data = func(self, endpoint, **kwargs)
-                cache_resource.set_result(data)
-                return data
-    return wrapper
+text_cached = disk_cached(serializer='text')
+
+
+def _pooled_session() -> requests.Session:
+    """Session reusing keep-alive connections, so that repeated requests skip the TCP and TLS handshakes."""
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(pool_connections=8, pool_maxsize=16))
+    return session
 
 
 @dataclass
@@ -114,29 +328,49 @@ class Result:
     tool: str
     server: str = 'https://www.ebi.ac.uk/Tools/services/rest'
     cache_dir: Path = Path('.ebi_tools_cache')
+    # EBITools hands its own session to the results it creates (see `EBITools._sharing_session`)
+    session: requests.Session = field(default_factory=_pooled_session, init=False, repr=False, compare=False)
 
     def result_types(self, **kwargs):
-        return requests.get(
+        return self.session.get(
             f'{self.server}/{self.tool}/resulttypes/{self.job_id}',
             **kwargs
         )
 
-    def _get(self, output: str, **kwargs):
-        return self._get_cached(
-            endpoint=self.tool,
-            output=output,
-            job_id=self.job_id,
+    def _get_output(self, output: str, serializer: str = 'bytes', cached_only=False, reset_cache=False, verbose=False, **kwargs):
+        with disk_cache(
+            self, self.tool, cached_only, serializer, reset_cache, verbose,
+            output=output, job_id=self.job_id, **kwargs
+        ) as cache_resource:
+            if not cache_resource.result:
+                cache_resource.set_result(self._fetch_output(output, serializer, cache_resource, **kwargs))
+            return cache_resource.result
+
+    def _fetch_output(self, output: str, serializer: str, cache_resource: CacheResource, headers=None, **kwargs):
+        headers = dict(headers or {})
+        etag = cache_resource.previous_meta.get('etag')
+        if etag:
+            # resetting the cache: revalidate the stored copy
+            headers['If-None-Match'] = etag
+        response = self.session.get(
+            f'{self.server}/{self.tool}/result/{self.job_id}/{output}',
+            headers=headers,
             **kwargs
         )
+        if response.status_code == 304 and cache_resource.previous:
+            cache_resource.meta['etag'] = etag
+            return cache_resource.previous
+        response.raise_for_status()
+        if 'ETag' in response.headers:
+            cache_resource.meta['etag'] = response.headers['ETag']
+        cache_resource.body = response.content
+        return loads(response.content) if serializer == 'json' else response.content
 
-    @disk_cached_sync
-    def _get_cached(self, endpoint: str, output: str, job_id: str, **kwargs):
-        return (
-            requests.get(
-                f'{self.server}/{endpoint}/result/{job_id}/{output}',
-                **kwargs
-            )
-        )
+    def _get_bytes(self, output: str, **kwargs) -> bytes:
+        return self._get_output(output, 'bytes', **kwargs)
+
+    def _get_text(self, output: str, **kwargs) -> str:
+        return self._get_bytes(output, **kwargs).decode(errors='replace')
 
 
 @dataclass
@@ -152,13 +386,27 @@ class JSONResult(Result):
 
     @cached_property
     def data(self) -> dict:
-        return loads(self._get('json').text)
+        # parsed once per instance; every instance parses its own copy
+        return self._get_output('json', 'json')
 
 
-def _int_or_none(x):
-    if isnull(x):
-        return None
-    return int(x)
+def _record_keys(records: list) -> list:
+    """Keys of all `records`, in order of first appearance (as the DataFrame constructor would order them)."""
+    if not records:
+        return []
+    keys = list(records[0])
+    if set().union(*records).difference(keys):
+        keys = list(dict.fromkeys(key for record in records for key in record))
+    return keys
+
+
+def _labelled(values: Series, labels: dict) -> Series:
+    """Categorical equivalent of `values.map(labels)`: labels are looked up once per category, not once per row."""
+    return (
+        values
+        .astype(CategoricalDtype(categories=list(labels)))
+        .cat.rename_categories(list(labels.values()))
+    )
 
 
 @dataclass
@@ -169,95 +417,116 @@ class BlastResult(JSONResult):
 
     @property
     def hits(self) -> DataFrame:
-        df = DataFrame(self.data['hits'])
+        return self._hits_frame()
+
+    def _hits_frame(self, exclude: frozenset = frozenset()) -> DataFrame:
+        hits = self.data['hits']
+        if exclude:
+            columns = [column for column in _record_keys(hits) if column not in exclude]
+            df = DataFrame(hits, columns=columns)
+        else:
+            df = DataFrame(hits)
         if df.empty:
           return df
+        if 'hit_db' in df:
+            df['hit_db'] = df['hit_db'].astype('category')
         return df.set_index('hit_num')
 
     @staticmethod
     def simplify(hits: DataFrame) -> DataFrame:
-        return (
-            hits
-            .assign(
-                existence=lambda df: df.hit_uni_pe.map(_int_or_none).map(protein_evidence_of_existence),
-                database=lambda df: df.hit_db.map({
-                    'SP': 'Swiss-Prot (Reviewed)',
-                    'TR': 'TrEMBL (Unreviewed)'
-                }),
-                uniprot_link=lambda df: ('<a href="' + df.hit_url + '" target="_blank">' + df.hit_acc + '</a>')
-            )
-            .drop(columns=[
-                'hit_def', 'hit_hsps', 'hit_desc',
-                'hit_xref_url', 'hit_url',
-                'hit_uni_ox', 'hit_db',
-                'hit_uni_pe'
-            ])
-            .rename(columns=lambda column: column.replace('hit_', ''))
-            .rename(columns={
-                'uni_de': 'description',
-                'uni_os': 'species',
-                'uni_gn': 'gene_name',
-                'uni_sv': 'sequence_version',
-                'len': 'length',
-                'acc': 'accession',
-                'id': 'identifier'
-            })
-        )
+        columns = {}
+        for column in hits.columns:
+            if column not in dropped_hit_columns:
+                columns[simple_hit_columns.get(column) or column.replace('hit_', '')] = hits[column]
+        columns['existence'] = _labelled(to_numeric(hits.hit_uni_pe, errors='coerce'), protein_evidence_of_existence)
+        columns['database'] = _labelled(hits.hit_db, hit_databases)
+        columns['uniprot_link'] = '<a href="' + hits.hit_url.str.cat(hits.hit_acc, sep='" target="_blank">') + '</a>'
+        return DataFrame(columns, index=hits.index)
 
     @staticmethod
     def extract_local_alignment(
         hits: DataFrame,
         sort: str = 'hsp_expect',
-        ascending: bool = False
+        ascending: bool = True
     ):
-        return hits.apply(
-            lambda row: (
-                DataFrame(row.hit_hsps)
-                .sort_values(sort, ascending)
-                .iloc[0]
-            ),
-            axis=1
-        ).rename(columns=lambda column: column.replace('hsp_', ''))
+        # after a stable sort, the first HSP of each hit is the one picked (by default the lowest e-value)
+        hsps = hits.hit_hsps.explode().dropna()
+        best = (
+            DataFrame(hsps.tolist(), index=hsps.index)
+            .sort_values(sort, ascending=ascending, kind='stable')
+            .groupby(level=0, sort=False)
+            .head(1)
+        )
+        return (
+            best.loc[hits.index[hits.index.isin(best.index)]]
+            .rename(columns=lambda column: column.replace('hsp_', ''))
+        )
 
+    @cached_property
     def hits_simple(self) -> DataFrame:
-      return self.simplify(self.hits)
+        return self.simplify(self._hits_frame(exclude=unused_hit_columns))
 
     @cached_property
     def visual(self) -> Union[SVG, Image]:
-        return self._wrap_image(self._get(f'visual-{self.image_format}').content)
+        return self._wrap_image(self._get_bytes(f'visual-{self.image_format}'))
 
     @cached_property
     def fast_family_and_domain_prediction(self) -> Union[SVG, Image]:
-        return self._wrap_image(self._get(f'ffdp-subject-{self.image_format}').content)
+        return self._wrap_image(self._get_bytes(f'ffdp-subject-{self.image_format}'))
 
     def _wrap_image(self, data):
         image_wrapper = graphics_wrappers[self.image_format]
         return image_wrapper(data=data)
 
     @cached_property
-    def _by_accession(self):
-        return self.hits_simple().set_index('accession')
+    def _by_accession(self) -> dict:
+        # the first (best-ranked) hit of each accession
+        by_accession = {}
+        for hit in self.data['hits']:
+            by_accession.setdefault(hit['hit_acc'], hit)
+        return by_accession
+
+    @cached_property
+    def _records(self) -> dict:
+        # simplified records by accession, filled in as they are looked up
+        return {}
+
+    def _record(self, accession) -> dict:
+        if accession not in self._records:
+            if 'hits_simple' in self.__dict__:
+                # the full table is built already: convert it in one go
+                table = self.hits_simple.drop_duplicates('accession').set_index('accession')
+                self._records.update(table.to_dict(orient='index'))
+            else:
+                hit = DataFrame([self._by_accession[accession]]).set_index('hit_num')
+                self._records[accession] = self.simplify(hit).iloc[0].drop('accession').to_dict()
+        return self._records[accession]
 
     def __getitem__(self, accession):
         return {
             'chosen': {
                 'accession': accession,
-                **self._by_accession.loc[accession].to_dict(),
+                **self._record(accession),
             },
             'all_results': self
         }
 
-    @property
+    @cached_property
     def hits_summary(self):
-        return self.hits_simple().style.format({'e_value': '{:e}', 'identity': '{:.2f}'})
+        return self.hits_simple.style.format({'e_value': '{:e}', 'identity': '{:.2f}'})
+
+    def _concurrently(self, *attributes: str):
+        # fetched together, yielded in order as each is ready
+        with ThreadPoolExecutor(max_workers=len(attributes)) as executor:
+            for future in [executor.submit(getattr, self, attribute) for attribute in attributes]:
+                yield future.result()
 
     def summarize(self):
-        display(self.hits_summary)
-        display(self.visual)
-        display(self.fast_family_and_domain_prediction)
+        for part in self._concurrently('hits_summary', 'visual', 'fast_family_and_domain_prediction'):
+            display(part)
 
     def __repr__(self):
-        return f'<{self.version} with {len(self.hits)} results>'
+        return f'<{self.version} with {len(self.data["hits"])} results>'
 
 
 def parse_needle_summary(text: str):
@@ -276,12 +545,12 @@ class NeedleResult(Result):
 
     @property
     def out(self) -> dict:
-        text = self._get('out').text
+        text = self._get_text('out')
         return parse_needle_summary(text)
 
     @property
     def alignment(self) -> dict:
-        return self._get('aln').text
+        return self._get_text('aln')
 
 
 @dataclass
@@ -290,6 +559,26 @@ class StretcherResult(Result):
     tool: str = 'emboss_stretcher'
 
 
+async def _in_thread(func: Callable, *args, **kwargs):
+    """Run a blocking call (such as a request) in the default executor, so that other jobs can proceed meanwhile."""
+    return await asyncio.get_running_loop().run_in_executor(None, partial(func, *args, **kwargs))
+
+
+def _retry_after(response: requests.Response) -> Optional[float]:
+    """Seconds to wait according to the `Retry-After` header, if the server sent one."""
+    value = response.headers.get('Retry-After')
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
 EBI_HEADERS = {
     'Accept': 'text/plain',
     'Content-Type': 'application/x-www-form-urlencoded'
@@ -304,6 +593,7 @@ class EBITools:
     attempts_threshold: int = 50
     backoff_limit: int = 10
     verbose: bool = True
+    session: requests.Session = field(default_factory=_pooled_session, repr=False, compare=False)
 
     async def blastp(self, sequence, exp='1e-10', stype='protein', database='uniprotkb', **query) -> BlastResult:
         job_id = await self._query_cached(
@@ -316,11 +606,11 @@ class EBITools:
             sequence=sequence,
             **query
         )
-        return BlastResult(
+        return self._sharing_session(BlastResult(
             job_id=job_id,
             server=self.server,
             cache_dir=self.cache_dir
-        )
+        ))
 
     async def needle(self, asequence, bsequence, matrix='EBLOSUM62', stype='protein', database='uniprotkb', **query) -> NeedleResult:
         """EMBOSS Needle creates an optimal global sequence alignment of two input sequences using the Needleman-Wunsch alignment algorithm."""
@@ -337,11 +627,11 @@ class EBITools:
             bsequence=bsequence,
             **query
         )
-        return NeedleResult(
+        return self._sharing_session(NeedleResult(
             job_id=job_id,
             server=self.server,
             cache_dir=self.cache_dir
-        )
+        ))
 
     async def stretcher(self, asequence, bsequence, matrix='EBLOSUM62', stype='protein', database='uniprotkb', **query) -> StretcherResult:
         """EMBOSS Stretcher creates an optimal global sequence alignment of two input sequences using O(min(N, M)) space."""
@@ -358,16 +648,21 @@ class EBITools:
             bsequence=bsequence,
             **query
         )
-        return StretcherResult(
+        return self._sharing_session(StretcherResult(
             job_id=job_id,
             server=self.server,
             cache_dir=self.cache_dir
-        )
+        ))
+
+    def _sharing_session(self, result: Result) -> Result:
+        result.session = self.session
+        return result
 
-    @disk_cached
+    @text_cached
     async def _query_cached(self, endpoint: str, **query) -> str:
         params = {'email': self.email, **query}
-        query = requests.post(
+        query = await _in_thread(
+            self.session.post,
             f'{self.server}/{endpoint}/run',
             params=params,
             headers=EBI_HEADERS
@@ -377,24 +672,29 @@ class EBITools:
         job_id = query.text
 
         status = None
-        i = 1
+        attempt = 0
+        retry_after = None
 
         while status != 'FINISHED':
-            if i > self.attempts_threshold:
+            if attempt >= self.attempts_threshold:
                 raise Exception(f'Not finished at {self.attempts_threshold}th attempt')
-            await asyncio.sleep(i)
-            status = (
-                requests.get(
-                    f'{self.server}/{endpoint}/status/{job_id}',
-                    headers={'Accept': 'text/plain'},
-                )
-                .text
+            # check straight away, then back off exponentially; Retry-After can only lengthen the wait
+            if attempt:
+                delay = 0.5 * 2 ** min(attempt - 1, 6) * (1 + 0.25 * random.random())
+                if retry_after is not None:
+                    delay = max(delay, retry_after)
+                await asyncio.sleep(min(delay, self.backoff_limit))
+            response = await _in_thread(
+                self.session.get,
+                f'{self.server}/{endpoint}/status/{job_id}',
+                headers={'Accept': 'text/plain'},
             )
-            assert status in {'RUNNING', 'FINISHED'}, status
+            status = response.text
+            retry_after = _retry_after(response)
+            assert status in {'QUEUED', 'RUNNING', 'FINISHED'}, status
             if self.verbose:
                 print('.', end='')
-            if i < self.backoff_limit:
-                i += 1
+            attempt += 1
 
         return job_id
 